@@ -1,27 +1,180 @@
 import os
 import json
 import shutil
-import glob
 import sys
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import datetime, timezone
 import re
+import functools
 import argparse
 import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # --- Configuration ---
 SRC_DIR = "src"
 WEB_DIR = "hike_and_run/tours"
 COPY_TIMESTAMP_FILE = "last_run.txt"  # Tracks the last time files were copied
+PHOTO_FILES = ['1.jpg', '2.jpg', '3.jpg']
+IO_BUFFER_SIZE = 1 << 20  # 1 MiB, batches the many small reads/writes of XML and JSON
+COPY_CHUNK_SIZE = 16 << 20  # 16 MiB per copy_file_range call
+FICLONE = 0x40049409  # Linux ioctl: reflink dst to src on CoW filesystems (btrfs, xfs)
+
+# --- GPX Tags (Clark notation, avoids namespace lookups) ---
+_GPX_NS = 'http://www.topografix.com/GPX/1/1'
+_METADATA = f'{{{_GPX_NS}}}metadata'
+_NAME = f'{{{_GPX_NS}}}name'
+_KEYWORDS = f'{{{_GPX_NS}}}keywords'
+_TIME = f'{{{_GPX_NS}}}time'
+_WPT = f'{{{_GPX_NS}}}wpt'
+_RTE = f'{{{_GPX_NS}}}rte'
+_TRK = f'{{{_GPX_NS}}}trk'
+_TRKSEG = f'{{{_GPX_NS}}}trkseg'
+_TRKPT = f'{{{_GPX_NS}}}trkpt'
+_ELE = f'{{{_GPX_NS}}}ele'
+
+# Common GPX timestamp shape: 2023-08-12T08:15:30Z (optional fraction)
+_ISO_UTC_RE = re.compile(r'^(\d{4})-(\d\d)-(\d\d)T(\d\d):(\d\d):(\d\d)(?:\.(\d{1,6}))?Z$')
+
+# Category prefixes ("10 Valais") and race years
+_CAT_PREFIX_RE = re.compile(r'^\d+[\s_-]*')
+_YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+# Tour dates: "August 2023" (see create_clean_gpx)
+_MONTH_YEAR_RE = re.compile(r'^([A-Z][a-z]+)\s+(\d{4})$')
+MONTHS = {
+    'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
+    'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12,
+}
 
 # --- Dependencies ---
 try:
-    from rdp import rdp
+    import numpy as np
     import polyline
 except ImportError:
-    print("Error: Missing libraries. Please run: pip install rdp polyline")
+    print("Error: Missing libraries. Please run: pip install numpy polyline")
     sys.exit(1)
 
+# Optional: JIT-compiled RDP kernel
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Optional: faster JSON encoding/decoding
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: content hash of the clean GPX in the stats cache
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Optional: reflink copies (Linux only)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# ==========================================
+# GEOMETRY
+# ==========================================
+
+def _rdp_vec(pts, eps):
+    """
+    Iterative Ramer-Douglas-Peucker on an (n, 2) array.
+    Returns a boolean mask of the points to keep.
+    """
+    n = len(pts)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0: return keep
+    keep[0] = keep[-1] = True
+
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2: continue
+
+        p1 = pts[lo]
+        v = pts[hi] - p1
+        w = pts[lo + 1:hi] - p1
+        norm = np.hypot(*v)
+        if norm > 0:
+            # Perpendicular distance to the line (p1, pn)
+            dists = np.abs(v[0] * w[:, 1] - v[1] * w[:, 0]) / norm
+        else:
+            # Closed loop: fall back to distance from p1
+            dists = np.hypot(w[:, 0], w[:, 1])
+
+        i = int(np.argmax(dists))
+        if dists[i] > eps:
+            mid = lo + 1 + i
+            keep[mid] = True
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+    return keep
+
+if njit:
+    @njit(cache=True, fastmath=True)
+    def _rdp_mask(lat, lon, eps2):
+        """
+        Same as _rdp_vec, compiled to scalar loops.
+        Takes two float64 arrays and the squared epsilon.
+        """
+        n = lat.shape[0]
+        keep = np.zeros(n, dtype=np.bool_)
+        if n == 0: return keep
+        keep[0] = True
+        keep[n - 1] = True
+
+        # Pending segments are disjoint, so n slots are always enough
+        stack = np.empty((n, 2), dtype=np.int64)
+        stack[0, 0] = 0
+        stack[0, 1] = n - 1
+        top = 1
+        while top > 0:
+            top -= 1
+            lo = stack[top, 0]
+            hi = stack[top, 1]
+
+            p1x = lat[lo]
+            p1y = lon[lo]
+            dx = lat[hi] - p1x
+            dy = lon[hi] - p1y
+            den = dx * dx + dy * dy
+
+            dmax = -1.0
+            idx = lo
+            for i in range(lo + 1, hi):
+                px = lat[i]
+                py = lon[i]
+                if den > 0.0:
+                    # Squared perpendicular distance to the line (p1, pn)
+                    d = (dx * (p1y - py) - dy * (p1x - px)) ** 2 / den
+                else:
+                    d = (px - p1x) ** 2 + (py - p1y) ** 2
+                if d > dmax:
+                    dmax = d
+                    idx = i
+
+            if dmax > eps2:
+                keep[idx] = True
+                if idx - lo >= 2:
+                    stack[top, 0] = lo
+                    stack[top, 1] = idx
+                    top += 1
+                if hi - idx >= 2:
+                    stack[top, 0] = idx
+                    stack[top, 1] = hi
+                    top += 1
+        return keep
+
+    # Compile (or load from cache) once at import
+    _rdp_mask(np.zeros(3), np.zeros(3), 0.0)
+
 # ==========================================
 # GPX PROCESSOR CLASS
 # ==========================================
@@ -29,34 +182,55 @@ except ImportError:
 class GPXProcessor:
     """Handles GPX parsing, merging, cleaning, and stats generation."""
 
-    NS = {'gpx': 'http://www.topografix.com/GPX/1/1'}
+    NS = {'gpx': _GPX_NS}
     ET.register_namespace('', NS['gpx'])
 
     def _get_tag(self, elem):
         return elem.tag.split('}', 1)[1] if '}' in elem.tag else elem.tag
 
-    def _parse_time(self, time_str):
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_time(time_str):
         if not time_str: return None
+        m = _ISO_UTC_RE.match(time_str.strip())
+        if m:
+            try:
+                *parts, frac = m.groups()
+                usec = int(frac.ljust(6, '0')) if frac else 0
+                return datetime(*map(int, parts), usec, tzinfo=timezone.utc)
+            except ValueError:
+                return None
         try:
             return datetime.fromisoformat(time_str.strip().replace('Z', '+00:00'))
         except ValueError:
             return None
 
-    def _extract_date_from_tree(self, root):
-        """Scans metadata and track points for the first valid timestamp."""
-        # 1. Check Metadata
-        for meta in root.findall('gpx:metadata', self.NS):
-            time_elem = meta.find('gpx:time', self.NS)
-            if time_elem is not None and time_elem.text:
-                return self._parse_time(time_elem.text)
-        
-        # 2. Check Track Points (Deep scan)
-        for trk in root.findall('gpx:trk', self.NS):
-            for seg in trk.findall('gpx:trkseg', self.NS):
-                for pt in seg.findall('gpx:trkpt', self.NS):
-                    time_elem = pt.find('gpx:time', self.NS)
-                    if time_elem is not None and time_elem.text:
-                        return self._parse_time(time_elem.text)
+    @staticmethod
+    def _to_floats(strs, dtype=np.float64):
+        """Converts strings to a float array in one call. Missing or invalid values become NaN."""
+        try:
+            return np.array(strs, dtype=dtype)
+        except (ValueError, TypeError):
+            # Slow path, only for malformed files
+            def to_float(s):
+                try: return float(s)
+                except (ValueError, TypeError): return np.nan
+            return np.array([to_float(s) for s in strs], dtype=dtype)
+
+    def _extract_date(self, gpx_path):
+        """Streams the file up to the first valid timestamp of the metadata or a track point."""
+        parents = []
+        # Default buffering: this usually stops within the first few KB
+        with open(gpx_path, 'rb') as f:
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    parents.append(elem.tag)
+                    continue
+
+                parents.pop()
+                if elem.tag == _TIME and elem.text and parents and parents[-1] in (_METADATA, _TRKPT):
+                    return self._parse_time(elem.text)
+                elem.clear()
         return None
 
     def create_clean_gpx(self, raw_files, output_path, tour_id):
@@ -66,8 +240,7 @@ class GPXProcessor:
             found_date = None
             for f in raw_files:
                 try:
-                    tree = ET.parse(f)
-                    date = self._extract_date_from_tree(tree.getroot())
+                    date = self._extract_date(f)
                     if date and (found_date is None or date < found_date):
                         found_date = date
                 except: continue
@@ -106,21 +279,21 @@ class GPXProcessor:
             # Iterate through files in the SORTED order provided
             for f in raw_files:
                 try:
-                    root = ET.parse(f).getroot()
-                    for trk in root.findall('gpx:trk', self.NS):
+                    with open(f, 'rb', buffering=IO_BUFFER_SIZE) as fh: root = ET.parse(fh).getroot()
+                    for trk in root.iterfind(_TRK):
                         new_trk = ET.SubElement(new_gpx, 'trk')
                         
                         # Name
-                        name_node = trk.find('gpx:name', self.NS)
+                        name_node = trk.find(_NAME)
                         ET.SubElement(new_trk, 'name').text = name_node.text if (name_node is not None) else title
                         
-                        for seg in trk.findall('gpx:trkseg', self.NS):
+                        for seg in trk.iterfind(_TRKSEG):
                             new_seg = ET.SubElement(new_trk, 'trkseg')
-                            for pt in seg.findall('gpx:trkpt', self.NS):
+                            for pt in seg.iterfind(_TRKPT):
                                 attr = {'lat': pt.get('lat'), 'lon': pt.get('lon')}
                                 new_pt = ET.SubElement(new_seg, 'trkpt', attr)
                                 # Keep Elevation
-                                ele = pt.find('gpx:ele', self.NS)
+                                ele = pt.find(_ELE)
                                 if ele is not None:
                                     ET.SubElement(new_pt, 'ele').text = ele.text
                 except: continue
@@ -128,34 +301,61 @@ class GPXProcessor:
             # Write
             tree = ET.ElementTree(new_gpx)
             if hasattr(ET, 'indent'): ET.indent(tree, space="  ", level=0)
-            tree.write(output_path, encoding='utf-8', xml_declaration=True)
+            with open(output_path, 'wb', buffering=IO_BUFFER_SIZE) as fh:
+                tree.write(fh, encoding='utf-8', xml_declaration=True)
             return True
         except Exception as e:
             print(f"  [Error] Failed to create GPX for {tour_id}: {e}")
             return False
 
     def get_stats(self, gpx_path):
-        """Calculates heavy stats (Polyline & Max Ele) for caching."""
-        points = []
-        max_ele = 0
+        """Calculates heavy stats (Polyline & Max Ele) and reads metadata (Name, Date) for caching."""
+        name, date_str = None, None
+        # Raw attribute strings, converted to arrays in one batch at the end
+        lat_strs, lon_strs, ele_strs = [], [], []
         try:
-            tree = ET.parse(gpx_path)
-            root = tree.getroot()
-            for trk in root.findall('gpx:trk', self.NS):
-                for seg in trk.findall('gpx:trkseg', self.NS):
-                    for pt in seg.findall('gpx:trkpt', self.NS):
-                        try:
-                            points.append((float(pt.get('lat')), float(pt.get('lon'))))
-                            ele = pt.find('gpx:ele', self.NS)
-                            if ele is not None:
-                                max_ele = max(max_ele, float(ele.text))
-                        except: pass
+            # Stream the file: points are read and freed one by one
+            with open(gpx_path, 'rb', buffering=IO_BUFFER_SIZE) as f:
+                for _, elem in ET.iterparse(f):
+                    if elem.tag == _TRKPT:
+                        attrib = elem.attrib
+                        lat_strs.append(attrib.get('lat'))
+                        lon_strs.append(attrib.get('lon'))
+                        # <ele> is the first child in GPX 1.1
+                        e = elem[0] if len(elem) else None
+                        if e is not None and e.tag != _ELE: e = elem.find(_ELE)
+                        ele_strs.append(e.text if e is not None else None)
+                        elem.clear()
+                    elif elem.tag == _TRKSEG:
+                        elem.clear()
+                    elif elem.tag == _METADATA:
+                        name_elem, keywords_elem = elem.find(_NAME), elem.find(_KEYWORDS)
+                        if name_elem is not None: name = name_elem.text
+                        if keywords_elem is not None: date_str = keywords_elem.text
+            
+            lat, lon = self._to_floats(lat_strs), self._to_floats(lon_strs)
+            ele = self._to_floats(ele_strs, np.float32)  # NaN: no elevation
+            
+            # Skip points with invalid coordinates
+            valid = ~(np.isnan(lat) | np.isnan(lon))
+            if not valid.all(): lat, lon, ele = lat[valid], lon[valid], ele[valid]
+            n = len(lat)
+            if not n: return None
             
-            if not points: return None
+            # Drop consecutive duplicates (pauses, merge seams) before simplifying
+            moved = np.concatenate(([True], (np.diff(lat) != 0) | (np.diff(lon) != 0)))
+            lat, lon = lat[moved], lon[moved]
+            # fmax skips NaN like nanmax, and the 0 floor also covers tracks without elevation
+            max_ele = np.fmax.reduce(ele, initial=0.0)
+            points = np.column_stack((lat, lon))
+            eps = 0.0002
+            keep = _rdp_mask(lat, lon, eps * eps) if njit else _rdp_vec(points, eps)
             
             return {
-                "summary_polyline": polyline.encode(rdp(points, epsilon=0.0002)),
-                "max_elevation": int(max_ele)
+                "summary_polyline": polyline.encode(points[keep].tolist()),
+                "max_elevation": int(max_ele),
+                "name": name,
+                "date_str": date_str
             }
         except Exception as e:
             print(f"  [Error] Stats failed for {gpx_path}: {e}")
@@ -163,18 +363,19 @@ class GPXProcessor:
 
     def parse_metadata(self, gpx_path):
         """Extracts lightweight metadata (Name, Date) for indexing."""
+        # <metadata> always precedes these, no need to read further
+        stop_tags = {_WPT, _RTE, _TRK}
         try:
-            tree = ET.parse(gpx_path)
-            root = tree.getroot()
-            name, date_str = None, None
-            
-            meta = root.find('gpx:metadata', self.NS)
-            if meta is not None:
-                n = meta.find('gpx:name', self.NS)
-                k = meta.find('gpx:keywords', self.NS)
-                if n is not None: name = n.text
-                if k is not None: date_str = k.text
-            return name, date_str
+            with open(gpx_path, 'rb') as f:
+                for event, elem in ET.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        if elem.tag in stop_tags: break
+                    elif elem.tag == _METADATA:
+                        n = elem.find(_NAME)
+                        k = elem.find(_KEYWORDS)
+                        return (n.text if n is not None else None,
+                                k.text if k is not None else None)
+            return None, None
         except:
             return None, None
 
@@ -188,7 +389,159 @@ def clean_category_name(folder_name):
     e.g. "10 Bas Valais" -> "Bas Valais"
     e.g. "20_France" -> "France"
     """
-    return re.sub(r'^\d+[\s_-]*', '', folder_name)
+    return _CAT_PREFIX_RE.sub('', folder_name)
+
+@functools.lru_cache(maxsize=None)
+def _date_str_to_ts(date_str):
+    """
+    Converts a keywords date ("2025-06-01" or "June 2025") into a sort timestamp.
+    Returns 0.0 if the date can't be parsed.
+    """
+    try: return datetime.fromisoformat(date_str).timestamp()
+    except: pass
+
+    # Fast path for "Month YYYY", strptime is slow
+    match = _MONTH_YEAR_RE.match(date_str)
+    if match and match.group(1) in MONTHS:
+        return datetime(int(match.group(2)), MONTHS[match.group(1)], 1).timestamp()
+
+    try: return datetime.strptime(date_str, "%B %Y").timestamp()
+    except: return 0.0
+
+def dump_json(obj, path, indent=False):
+    """Writes obj as UTF-8 JSON (2-space indent if requested), with orjson when available."""
+    if orjson:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    else:
+        data = json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def load_json(path):
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read()) if orjson else json.load(f)
+
+def _kernel_copy(src_fd, dst_fd, size):
+    """Copies without going through user space. Returns False if the kernel can't do it."""
+    # 1. Reflink: constant time, no data copied
+    if fcntl and sys.platform.startswith('linux'):
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError: pass
+
+    # 2. In-kernel copy
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while size > 0:
+                n = os.copy_file_range(src_fd, dst_fd, min(size, COPY_CHUNK_SIZE))
+                if n == 0: break
+                size -= n
+            return True
+        except OSError: pass
+    return False
+
+def fast_copy(src, dst):
+    """Copies src to dst and keeps its timestamps, like shutil.copy2."""
+    with open(src, 'rb', buffering=0) as fsrc:
+        st = os.fstat(fsrc.fileno())
+        fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try: copied = _kernel_copy(fsrc.fileno(), fd, st.st_size)
+        finally: os.close(fd)
+
+    if not copied: shutil.copyfile(src, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+def scan_src():
+    """
+    Walks SRC_DIR once with os.scandir and returns one record per tour,
+    sorted by category then tour id.
+    Mtimes come from the DirEntry stats (None if the file is missing).
+    """
+    def visible_dirs(path):
+        with os.scandir(path) as it:
+            return sorted((e for e in it if e.is_dir() and not e.name.startswith('.')), key=lambda e: e.name)
+
+    tours = []
+    # Sorted folders (so 10... processes before 20...)
+    for cat in visible_dirs(SRC_DIR):
+        for tour in visible_dirs(cat.path):
+            with os.scandir(tour.path) as it:
+                files = {e.name: e for e in it if e.is_file()}
+
+            clean_name = f"{tour.name}.gpx"
+            gpx_entry, cache_entry = files.get(clean_name), files.get("polyline.json")
+            tours.append({
+                "category": cat.name,
+                "id": tour.name,
+                "clean_gpx": os.path.join(tour.path, clean_name),
+                "cache_json": os.path.join(tour.path, "polyline.json"),
+                "gpx_mtime": gpx_entry.stat().st_mtime if gpx_entry else None,
+                "cache_mtime": cache_entry.stat().st_mtime if cache_entry else None,
+                # Raw GPX files still to be merged into the clean one
+                "raw_gpx": sorted(e.path for name, e in files.items()
+                                  if name.endswith('.gpx') and name != clean_name and not name.startswith('.')),
+                "photos": {img: files[img].stat().st_mtime for img in PHOTO_FILES if img in files},
+            })
+    return tours
+
+# Phase 1 workers: module-level so they pickle cheaply into the process pool
+
+def generate_tour(raw_files, clean_gpx, tour_id, trash_dir):
+    """Builds the clean GPX, then trashes the raw files. Returns its mtime, or None on failure."""
+    if not GPXProcessor().create_clean_gpx(raw_files, clean_gpx, tour_id):
+        return None
+
+    # One Trash folder per tour and run, filled with plain renames
+    trash_sub = os.path.join(trash_dir, f"HikeAndRun_{tour_id}_{time.strftime('%Y%m%d-%H%M%S')}")
+    try:
+        os.makedirs(trash_sub, exist_ok=True)
+    except OSError as e:
+        print(f"    [Warning] Failed to create {trash_sub}: {e}")
+        return os.path.getmtime(clean_gpx)
+
+    for raw_f in raw_files:
+        dst = os.path.join(trash_sub, os.path.basename(raw_f))
+        try:
+            os.rename(raw_f, dst)
+        except OSError:
+            # Trash on another filesystem: copy + delete
+            try: shutil.move(raw_f, dst)
+            except Exception as e: print(f"    [Warning] Failed to trash {raw_f}: {e}")
+    return os.path.getmtime(clean_gpx)
+
+def gpx_fingerprint(path):
+    """Size, mtime and (with xxhash) content hash of the clean GPX, stored with its stats."""
+    st = os.stat(path)
+    fingerprint = {"src_size": st.st_size, "src_mtime": st.st_mtime}
+    if xxhash:
+        h = xxhash.xxh3_64()
+        with open(path, 'rb', buffering=0) as f:
+            for chunk in iter(lambda: f.read(IO_BUFFER_SIZE), b''): h.update(chunk)
+        fingerprint["src_hash"] = h.hexdigest()
+    return fingerprint
+
+def cache_tour(clean_gpx, cache_json):
+    """Writes the stats cache, recomputing only if the GPX changed. Returns its mtime, or None on failure."""
+    fingerprint = gpx_fingerprint(clean_gpx)
+    try: stats = load_json(cache_json)
+    except: stats = None
+
+    # A touched but identical GPX only refreshes the fingerprint
+    if stats and 'src_hash' in fingerprint:
+        unchanged = stats.get('src_hash') == fingerprint['src_hash']
+    elif stats:
+        unchanged = stats.get('src_size') == fingerprint['src_size'] and stats.get('src_mtime') == fingerprint['src_mtime']
+    else:
+        unchanged = False
+
+    if not unchanged:
+        stats = GPXProcessor().get_stats(clean_gpx)
+        if not stats: return None
+
+    stats.update(fingerprint)
+    dump_json(stats, cache_json)
+    return os.path.getmtime(cache_json)
 
 def run_pipeline(skip_images):
     print("--- Starting HikeAndRun Build ---")
@@ -198,6 +551,7 @@ def run_pipeline(skip_images):
         return
 
     processor = GPXProcessor()
+    tours = scan_src()
     
     # --- PHASE 1: PROCESS & CACHE (In SRC) ---
     print(f"\n[Phase 1] Processing Source ({SRC_DIR})...")
@@ -207,47 +561,36 @@ def run_pipeline(skip_images):
         try: os.makedirs(trash_dir)
         except: pass
 
-    # Iterate sorted folders (so 10... processes before 20...)
-    for category_folder in sorted(os.listdir(SRC_DIR)):
-        cat_path = os.path.join(SRC_DIR, category_folder)
-        if not os.path.isdir(cat_path) or category_folder.startswith('.'): continue
-
-        for tour_id in sorted(os.listdir(cat_path)):
-            tour_path = os.path.join(cat_path, tour_id)
-            if not os.path.isdir(tour_path) or tour_id.startswith('.'): continue
-
-            clean_gpx = os.path.join(tour_path, f"{tour_id}.gpx")
-            cache_json = os.path.join(tour_path, "polyline.json")
-
-            # A. Generate Clean GPX if missing
-            if not os.path.exists(clean_gpx):
-                raw_files = sorted([f for f in glob.glob(os.path.join(tour_path, "*.gpx")) if f != clean_gpx])
-                
-                if raw_files:
-                    print(f"  + Generating GPX: {tour_id} (merging {len(raw_files)} files)")
-                    if processor.create_clean_gpx(raw_files, clean_gpx, tour_id):
-                        # --- MOVE TO TRASH ON SUCCESS ---
-                        print(f"  - Moving {len(raw_files)} raw files to Trash")
-                        for raw_f in raw_files:
-                            try:
-                                fname = os.path.basename(raw_f)
-                                trash_name = f"{tour_id}_{fname}"
-                                dst = os.path.join(trash_dir, trash_name)
-                                shutil.move(raw_f, dst)
-                            except Exception as e:
-                                print(f"    [Warning] Failed to trash {raw_f}: {e}")
+    # Tours are independent: parse/merge/RDP run in parallel, one tour per task
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        # A. Generate Clean GPX if missing
+        jobs = []
+        for tour in tours:
+            if tour['gpx_mtime'] is not None: continue
+            raw_files = tour['raw_gpx']
             
-            # B. Update Cache if missing or stale
-            if os.path.exists(clean_gpx):
-                needs_update = not os.path.exists(cache_json) or \
-                               os.path.getmtime(clean_gpx) > os.path.getmtime(cache_json)
-                
-                if needs_update:
-                    stats = processor.get_stats(clean_gpx)
-                    if stats:
-                        with open(cache_json, 'w', encoding='utf-8') as f:
-                            json.dump(stats, f)
-                        # print(f"  + Cached Stats: {tour_id}")
+            if raw_files:
+                print(f"  + Generating GPX: {tour['id']} (merging {len(raw_files)} files)")
+                jobs.append((tour, len(raw_files), pool.submit(generate_tour, raw_files, tour['clean_gpx'], tour['id'], trash_dir)))
+
+        for tour, n_raw, job in jobs:
+            tour['gpx_mtime'] = job.result()
+            if tour['gpx_mtime'] is not None:
+                print(f"  - Moved {n_raw} raw files of {tour['id']} to Trash")
+        
+        # B. Update Cache if missing or stale
+        jobs = []
+        for tour in tours:
+            if tour['gpx_mtime'] is None: continue
+            needs_update = tour['cache_mtime'] is None or tour['gpx_mtime'] > tour['cache_mtime']
+            
+            if needs_update:
+                jobs.append((tour, pool.submit(cache_tour, tour['clean_gpx'], tour['cache_json'])))
+
+        for tour, job in jobs:
+            cache_mtime = job.result()
+            if cache_mtime is not None:
+                tour['cache_mtime'] = cache_mtime
 
     # --- PHASE 2: PUBLISH (Copy to Web) ---
     print(f"\n[Phase 2] Publishing to ({WEB_DIR})...")
@@ -261,36 +604,35 @@ def run_pipeline(skip_images):
     else:
         print("  [Info] First run (or timestamp missing): Copying all files.")
 
-    # Selective Tour Copy
-    copied_count = 0
+    # Selective Tour Copy: (src, dst, label) jobs, run on a thread pool below
+    copy_jobs = []
     
-    for root, dirs, files in os.walk(SRC_DIR):
-        if os.path.basename(root) == SRC_DIR: continue
-        
-        tour_id = os.path.basename(root)
-        src_gpx = os.path.join(root, f"{tour_id}.gpx")
+    for tour in tours:
+        tour_id = tour['id']
+        src_dir = os.path.dirname(tour['clean_gpx'])
         
         # Only process if we have a valid processed GPX
-        if os.path.exists(src_gpx):
+        if tour['gpx_mtime'] is not None:
             dst_folder = os.path.join(WEB_DIR, tour_id)
             os.makedirs(dst_folder, exist_ok=True)
             
             # 1. Copy GPX (Only if modified)
-            if os.path.getmtime(src_gpx) > last_run_ts:
-                # copy2 preserves timestamps
-                shutil.copy2(src_gpx, os.path.join(dst_folder, f"{tour_id}.gpx"))
-                print(f"  > Copied GPX: {tour_id}.gpx")
-                copied_count += 1
+            if tour['gpx_mtime'] > last_run_ts:
+                copy_jobs.append((tour['clean_gpx'], os.path.join(dst_folder, f"{tour_id}.gpx"), f"GPX: {tour_id}.gpx"))
 
             # 2. Copy Photos (Only if modified)
             if not skip_images:
-                for img in ['1.jpg', '2.jpg', '3.jpg']:
-                    src_img = os.path.join(root, img)
-                    if os.path.exists(src_img):
-                        if os.path.getmtime(src_img) > last_run_ts:
-                            shutil.copy2(src_img, os.path.join(dst_folder, img))
-                            print(f"  > Copied Photo: {tour_id}/{img}")
-                            copied_count += 1
+                for img, img_mtime in tour['photos'].items():
+                    if img_mtime > last_run_ts:
+                        copy_jobs.append((os.path.join(src_dir, img), os.path.join(dst_folder, img), f"Photo: {tour_id}/{img}"))
+
+    # Copying is I/O-bound, threads are enough
+    if copy_jobs:
+        srcs, dsts, labels = zip(*copy_jobs)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for label, _ in zip(labels, pool.map(fast_copy, srcs, dsts)):
+                print(f"  > Copied {label}")
+    copied_count = len(copy_jobs)
 
     # --- PHASE 3: INDEX ---
     tours_json_path = os.path.join(WEB_DIR, "tours.json")
@@ -302,28 +644,27 @@ def run_pipeline(skip_images):
         print(f"\n[Phase 3] Generating Index...")
         final_index = []
 
-        for category_folder in sorted(os.listdir(SRC_DIR)):
-            cat_path = os.path.join(SRC_DIR, category_folder)
-            if not os.path.isdir(cat_path) or category_folder.startswith('.'): continue
-
+        for category_folder, cat_tours in itertools.groupby(tours, key=lambda t: t['category']):
             display_category = clean_category_name(category_folder)
             current_cat_tours = []
 
-            for tour_id in sorted(os.listdir(cat_path)):
-                # Paths
+            for tour in cat_tours:
+                tour_id = tour['id']
                 web_gpx = os.path.join(WEB_DIR, tour_id, f"{tour_id}.gpx")
-                src_cache = os.path.join(cat_path, tour_id, "polyline.json")
                 
-                if not os.path.exists(web_gpx) or not os.path.exists(src_cache):
+                if tour['cache_mtime'] is None or not os.path.exists(web_gpx):
                     continue
                 
                 # Read Stats (Cache)
                 try:
-                    with open(src_cache, 'r') as f: stats = json.load(f)
+                    stats = load_json(tour['cache_json'])
                 except: continue
                 
-                # Read Metadata (Live GPX from Web/Dst)
-                name, date_str = processor.parse_metadata(web_gpx)
+                # Read Metadata (cached with the stats, older caches fall back to the live GPX)
+                if 'name' in stats:
+                    name, date_str = stats['name'], stats['date_str']
+                else:
+                    name, date_str = processor.parse_metadata(web_gpx)
                 
                 # Process Metadata
                 title = name.strip() if name else tour_id
@@ -332,17 +673,12 @@ def run_pipeline(skip_images):
                 if is_race and "🏁" not in title:
                     year = None
                     if date_str:
-                        match = re.search(r'\b(19|20)\d{2}\b', date_str)
+                        match = _YEAR_RE.search(date_str)
                         if match: year = match.group(0)
                     title = f"🏁 {year} - {title}" if year else f"🏁 {title}"
                 
                 # Date Sort Helper
-                sort_ts = 0.0
-                if date_str:
-                    try: sort_ts = datetime.fromisoformat(date_str).timestamp()
-                    except:
-                        try: sort_ts = datetime.strptime(date_str, "%B %Y").timestamp()
-                        except: pass
+                sort_ts = _date_str_to_ts(date_str) if date_str else 0.0
 
                 entry = {
                     "id": tour_id,
@@ -373,8 +709,7 @@ def run_pipeline(skip_images):
                 })
 
         # Save
-        with open(tours_json_path, 'w', encoding='utf-8') as f:
-            json.dump(final_index, f, indent=4, ensure_ascii=False)
+        dump_json(final_index, tours_json_path, indent=True)
         print(f"Done! Site built in '{WEB_DIR}'. Indexed {len(final_index)} categories.")
 
     # Update Timestamp File at end of successful run